@@ -7,7 +7,14 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 import difflib
+import math
+import mmap
+import multiprocessing
 import re
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat, zip_longest
 
 # Enhanced imports for document processing
 import pdfplumber  # Better PDF handling
@@ -19,6 +26,279 @@ from pathvalidate import sanitize_filename
 import Levenshtein
 from jinja2 import Template
 
+# Optional SIMD edit-distance kernel; python-Levenshtein is used when missing
+try:
+    import stringzilla as sz
+except ImportError:
+    sz = None
+
+# Optional bit-parallel (Myers) edit distance for long texts
+try:
+    import edlib
+except ImportError:
+    edlib = None
+
+# Optional C++ Jaro-Winkler; textdistance's pure Python version is the fallback
+try:
+    from rapidfuzz.distance import JaroWinkler
+except ImportError:
+    JaroWinkler = None
+
+# Optional fast JSON encoder for exports
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional libgit2 bindings for patience diff on large documents
+try:
+    import pygit2
+except ImportError:
+    pygit2 = None
+
+# Above this many line pairs difflib's quadratic matcher gets too slow
+PATIENCE_DIFF_THRESHOLD = 10_000_000
+
+# PDFs with fewer pages are extracted serially, IPC and the pool's first start
+# (workers import pdfplumber) would dominate
+PARALLEL_PDF_MIN_PAGES = 16
+
+# Forking the threaded Streamlit server can deadlock on locks held by other
+# threads, so PDF workers start from a clean process instead
+_PDF_POOL_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_pdf_pool_lock = threading.Lock()
+
+# Number of extracted documents kept in memory per comparer
+TEXT_CACHE_SIZE = 8
+
+# Prefix and run color of each difference type in DOCX reports
+_DOCX_DIFF_STYLES = {
+    'addition': ('+ ', RGBColor(0, 128, 0)),
+    'deletion': ('- ', RGBColor(255, 0, 0)),
+    'context': ('  ', None)
+}
+
+_HTML_SRC = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Document Comparison Report</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; }
+        .header { background-color: #f0f0f0; padding: 15px; border-radius: 5px; }
+        .stats-table { border-collapse: collapse; width: 100%; margin: 20px 0; }
+        .stats-table th, .stats-table td { border: 1px solid #ddd; padding: 8px; text-align: left; }
+        .stats-table th { background-color: #f2f2f2; }
+        .addition { color: green; font-weight: bold; }
+        .deletion { color: red; font-weight: bold; }
+        .context { color: #666; }
+        .similarity { font-size: 24px; text-align: center; padding: 20px; }
+        .similarity.high { color: green; }
+        .similarity.medium { color: orange; }
+        .similarity.low { color: red; }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>Enhanced Document Comparison Report</h1>
+        <p>Generated: {{ timestamp }}</p>
+        <p>Algorithm: {{ algorithm }}</p>
+    </div>
+    
+    <h2>Files Compared</h2>
+    <ul>
+        <li>File 1: {{ file1_path }}</li>
+        <li>File 2: {{ file2_path }}</li>
+    </ul>
+    
+    <h2>Statistics</h2>
+    <table class="stats-table">
+        <tr><th>Metric</th><th>File 1</th><th>File 2</th><th>Difference</th></tr>
+        <tr><td>Characters</td><td>{{ stats.text1.characters }}</td><td>{{ stats.text2.characters }}</td><td>{{ char_diff }}</td></tr>
+        <tr><td>Words</td><td>{{ stats.text1.words }}</td><td>{{ stats.text2.words }}</td><td>{{ word_diff }}</td></tr>
+        <tr><td>Lines</td><td>{{ stats.text1.lines }}</td><td>{{ stats.text2.lines }}</td><td>{{ line_diff }}</td></tr>
+    </table>
+    
+    <div class="similarity {{ similarity_class }}">
+        Similarity: {{ similarity }}%
+    </div>
+    
+    <h2>Differences</h2>
+    <div class="differences">
+        {% for diff in differences %}
+            {% if diff.type == 'addition' %}
+                <div class="addition">+ {{ diff.content }}</div>
+            {% elif diff.type == 'deletion' %}
+                <div class="deletion">- {{ diff.content }}</div>
+            {% elif diff.type == 'context' %}
+                <div class="context">  {{ diff.content }}</div>
+            {% endif %}
+        {% endfor %}
+    </div>
+</body>
+</html>
+"""
+# Compiled once at import, Jinja's lexer/parser is not rerun on every export
+_HTML_TEMPLATE = Template(_HTML_SRC)
+
+# Texts whose length difference alone exceeds this share of the longer
+# text are reported from the length bound without computing the distance
+LEVENSHTEIN_SKIP_RATIO = 0.5
+
+# Below this length edlib's dispatch overhead outweighs the bit-parallel gain
+EDLIB_MIN_LENGTH = 4096
+_CIGAR_RE = re.compile(r'(\d+)([=XID])')
+_HUNK_RE = re.compile(r'@@ -(\d+),?(\d*) \+(\d+),?(\d*) @@')
+# Line boundaries other than \n that str.splitlines() also splits on
+_OTHER_LINE_BREAKS_RE = re.compile('[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')
+# Of those, the ones git doesn't split on (it only knows \n, \r\n ends in one)
+_NON_GIT_LINE_BREAKS_RE = re.compile('\r(?!\n)|[\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')
+
+
+def _read_pdf_page(page, collect_fonts: bool = False) -> Tuple[Optional[str], bool, set]:
+    """Text, image flag and font names of a single pdfplumber page"""
+    page_text = page.extract_text()
+    has_images = bool(hasattr(page, 'images') and page.images)
+    
+    fonts = set()
+    if collect_fonts and hasattr(page, 'chars'):
+        # Limit to avoid performance issues
+        fonts.update(c['fontname'] for c in page.chars[:100] if 'fontname' in c)
+    
+    return page_text, has_images, fonts
+
+
+def _extract_page_range(path: str, start: int, stop: int,
+                        collect_fonts: bool = False) -> List[Tuple[int, Optional[str], bool, set]]:
+    """Process pool worker: open the PDF once and read pages start..stop-1"""
+    with pdfplumber.open(path, pages=list(range(start + 1, stop + 1))) as pdf:
+        return [(page_num, *_read_pdf_page(page, collect_fonts))
+                for page_num, page in zip(range(start, stop), pdf.pages)]
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Process pool shared by all extractions, started on first use and kept warm"""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        # A worker that died (e.g. OOM-killed) leaves the pool broken for good
+        if _pdf_pool is None or getattr(_pdf_pool, '_broken', False):
+            _pdf_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                            mp_context=_PDF_POOL_CONTEXT)
+        return _pdf_pool
+
+
+def _read_text_file(file_path: Path) -> str:
+    """Decode a UTF-8 file straight from a read-only mapping of the page cache"""
+    with open(file_path, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            return ''  # Empty files can't be mapped
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            text = str(mm, 'utf-8')
+    
+    # Same newline translation as reading in text mode
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def _jaro_winkler(text1: str, text2: str) -> float:
+    if JaroWinkler is not None:
+        return JaroWinkler.normalized_similarity(text1, text2)
+    return textdistance.jaro_winkler(text1, text2)
+
+
+def _count_lines(text: str) -> int:
+    """len(text.splitlines()) without building the list of lines"""
+    if _OTHER_LINE_BREAKS_RE.search(text):
+        return len(text.splitlines())
+    return text.count('\n') + (1 if text and not text.endswith('\n') else 0)
+
+
+def _intern_lines(lines1: List[str], lines2: List[str]) -> Tuple[List[int], List[int]]:
+    """Map lines to small integer ids so the matcher compares ints, not strings"""
+    ids = {}
+    ids1 = [ids.setdefault(line, len(ids)) for line in lines1]
+    ids2 = [ids.setdefault(line, len(ids)) for line in lines2]
+    return ids1, ids2
+
+
+def _grouped_opcodes(lines1: List[str], lines2: List[str], n: int):
+    ids1, ids2 = _intern_lines(lines1, lines2)
+    return difflib.SequenceMatcher(None, ids1, ids2).get_grouped_opcodes(n)
+
+
+def _format_range_unified(start: int, stop: int) -> str:
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f"{beginning}"
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def _format_range_git(start: int, count: int) -> str:
+    """Unified range of a libgit2 hunk, whose start is 1-based or the line before an empty range"""
+    beginning = start - 1 if count else start
+    return _format_range_unified(beginning, beginning + count)
+
+
+def _format_range_context(start: int, stop: int) -> str:
+    beginning = start + 1
+    length = stop - start
+    if not length:
+        beginning -= 1
+    if length <= 1:
+        return f"{beginning}"
+    return f"{beginning},{beginning + length - 1}"
+
+
+def _unified_diff_lines(lines1: List[str], lines2: List[str], n: int = 3) -> List[str]:
+    """Same output as difflib.unified_diff(..., lineterm='') on interned lines"""
+    diff = []
+    for group in _grouped_opcodes(lines1, lines2, n):
+        if not diff:
+            diff.append('--- File 1')
+            diff.append('+++ File 2')
+        first, last = group[0], group[-1]
+        diff.append(f"@@ -{_format_range_unified(first[1], last[2])} "
+                    f"+{_format_range_unified(first[3], last[4])} @@")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == 'equal':
+                diff.extend(' ' + line for line in lines1[i1:i2])
+                continue
+            if tag in ('replace', 'delete'):
+                diff.extend('-' + line for line in lines1[i1:i2])
+            if tag in ('replace', 'insert'):
+                diff.extend('+' + line for line in lines2[j1:j2])
+    return diff
+
+
+def _context_diff_lines(lines1: List[str], lines2: List[str], n: int = 3) -> List[str]:
+    """Same output as difflib.context_diff(..., lineterm='') on interned lines"""
+    prefix = {'insert': '+ ', 'delete': '- ', 'replace': '! ', 'equal': '  '}
+    diff = []
+    for group in _grouped_opcodes(lines1, lines2, n):
+        if not diff:
+            diff.append('*** File 1')
+            diff.append('--- File 2')
+        first, last = group[0], group[-1]
+        diff.append('***************')
+        diff.append(f"*** {_format_range_context(first[1], last[2])} ****")
+        if any(tag in ('replace', 'delete') for tag, _, _, _, _ in group):
+            for tag, i1, i2, _, _ in group:
+                if tag != 'insert':
+                    diff.extend(prefix[tag] + line for line in lines1[i1:i2])
+        diff.append(f"--- {_format_range_context(first[3], last[4])} ----")
+        if any(tag in ('replace', 'insert') for tag, _, _, _, _ in group):
+            for tag, _, _, j1, j2 in group:
+                if tag != 'delete':
+                    diff.extend(prefix[tag] + line for line in lines2[j1:j2])
+    return diff
+
+
 class EnhancedDocumentComparer:
     """Enhanced document comparison with multiple algorithms for web interface"""
     
@@ -31,6 +311,11 @@ class EnhancedDocumentComparer:
             'jaro_winkler': 'Jaro-Winkler similarity',
             'semantic': 'Semantic similarity comparison'
         }
+        # Reading page.chars makes pdfminer re-parse every page, so font
+        # collection is opt-in
+        self.collect_fonts = False
+        # Extracted (text, metadata) keyed by (path, size, mtime_ns, collect_fonts)
+        self._text_cache: OrderedDict = OrderedDict()
     
     def extract_text_from_file(self, file_path: str) -> Tuple[str, Dict]:
         """Extract text from various file formats with metadata"""
@@ -39,9 +324,16 @@ class EnhancedDocumentComparer:
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
         
+        file_stat = file_path.stat()
+        cache_key = (str(file_path), file_stat.st_size, file_stat.st_mtime_ns, self.collect_fonts)
+        if cache_key in self._text_cache:
+            self._text_cache.move_to_end(cache_key)
+            text, metadata = self._text_cache[cache_key]
+            return text, dict(metadata)
+        
         metadata = {
-            'file_size': file_path.stat().st_size,
-            'modified_time': datetime.fromtimestamp(file_path.stat().st_mtime),
+            'file_size': file_stat.st_size,
+            'modified_time': datetime.fromtimestamp(file_stat.st_mtime),
             'file_type': file_path.suffix.lower()
         }
         
@@ -52,21 +344,24 @@ class EnhancedDocumentComparer:
             text, docx_meta = self._extract_docx_text(file_path)
             metadata.update(docx_meta)
         elif file_path.suffix.lower() == '.txt':
-            with open(file_path, 'r', encoding='utf-8') as f:
-                text = f.read()
+            text = _read_text_file(file_path)
             metadata['encoding'] = 'utf-8'
         else:
             raise ValueError(f"Unsupported file format: {file_path.suffix}")
         
-        return text, metadata
+        self._text_cache[cache_key] = (text, metadata)
+        if len(self._text_cache) > TEXT_CACHE_SIZE:
+            self._text_cache.popitem(last=False)
+        
+        return text, dict(metadata)
     
     def _extract_pdf_text(self, file_path: Path) -> Tuple[str, Dict]:
         """Enhanced PDF text extraction with pdfplumber"""
-        text = ""
+        parts: List[str] = []
         metadata = {
             'pages': 0,
             'has_images': False,
-            'fonts': set(),
+            'fonts': [],
             'creation_date': '',
             'author': '',
             'title': ''
@@ -81,69 +376,95 @@ class EnhancedDocumentComparer:
                 metadata['author'] = pdf.metadata.get('Author', '')
                 metadata['title'] = pdf.metadata.get('Title', '')
             
-            for page_num, page in enumerate(pdf.pages):
-                page_text = page.extract_text()
-                if page_text:
-                    text += f"[PAGE {page_num + 1}]\n{page_text}\n\n"
-                
-                # Check for images
-                if hasattr(page, 'images') and page.images:
-                    metadata['has_images'] = True
-                
-                # Get font information if available
-                if hasattr(page, 'chars'):
-                    chars = page.chars
-                    for char in chars[:100]:  # Limit to avoid performance issues
-                        if 'fontname' in char:
-                            metadata['fonts'].add(char['fontname'])
-        
-        metadata['fonts'] = list(metadata['fonts'])
+            n_pages = metadata['pages']
+            if n_pages < PARALLEL_PDF_MIN_PAGES:
+                pages = [(page_num, *_read_pdf_page(page, self.collect_fonts))
+                         for page_num, page in enumerate(pdf.pages)]
+            else:
+                pages = None
+        
+        if pages is None:
+            # pdfminer parsing is CPU bound, spread the pages over processes
+            # Each worker gets one contiguous range, so the PDF is opened once per worker
+            workers = min(n_pages, os.cpu_count() or 1)
+            step = math.ceil(n_pages / workers)
+            starts = range(0, n_pages, step)
+            stops = [min(start + step, n_pages) for start in starts]
+            chunks = _get_pdf_pool().map(_extract_page_range, repeat(str(file_path)),
+                                         starts, stops, repeat(self.collect_fonts))
+            pages = [page for chunk in chunks for page in chunk]
+        
+        has_images = False
+        fonts: set = set()
+        for page_num, page_text, page_has_images, page_fonts in pages:
+            if page_text:
+                parts.append(f"[PAGE {page_num + 1}]\n{page_text}\n\n")
+            
+            # Check for images
+            has_images = has_images or page_has_images
+            fonts.update(page_fonts)
+        
+        text = "".join(parts)
+        metadata['has_images'] = has_images
+        metadata['fonts'] = list(fonts)
         
         return text, metadata
     
     def _extract_docx_text(self, file_path: Path) -> Tuple[str, Dict]:
         """Enhanced DOCX text extraction with formatting info"""
         doc = Document(str(file_path))
-        text = ""
+        # python-docx rebuilds these lists on every attribute access
+        paragraphs = doc.paragraphs
+        tables = doc.tables
+        parts: List[str] = []
+        styles: set = set()
         metadata = {
-            'paragraphs': len(doc.paragraphs),
-            'tables': len(doc.tables),
+            'paragraphs': len(paragraphs),
+            'tables': len(tables),
             'has_images': False,
-            'styles': set()
+            'styles': []
         }
         
         # Extract paragraph text with basic formatting info
-        for para in doc.paragraphs:
-            if para.text.strip():
-                style_name = para.style.name if para.style else 'Normal'
-                metadata['styles'].add(style_name)
-                text += f"{para.text}\n"
+        for para in paragraphs:
+            para_text = para.text
+            if para_text.strip():
+                styles.add(para.style.name if para.style else 'Normal')
+                parts.append(para_text)
+                parts.append("\n")
         
         # Extract table content
-        for table in doc.tables:
-            text += "\n[TABLE]\n"
+        for table in tables:
+            parts.append("\n[TABLE]\n")
             for row in table.rows:
-                row_text = []
-                for cell in row.cells:
-                    row_text.append(cell.text.strip())
-                text += " | ".join(row_text) + "\n"
-            text += "[/TABLE]\n\n"
+                parts.append(" | ".join(cell.text.strip() for cell in row.cells))
+                parts.append("\n")
+            parts.append("[/TABLE]\n\n")
+        
+        text = "".join(parts)
         
         # Check for images (basic check)
         if hasattr(doc, 'inline_shapes'):
             metadata['has_images'] = len(doc.inline_shapes) > 0
         
-        metadata['styles'] = list(metadata['styles'])
+        metadata['styles'] = list(styles)
         
         return text, metadata
     
-    def compare_documents(self, file1: str, file2: str, algorithm: str = 'unified') -> Dict:
+    def compare_documents(self, file1: str, file2: str, algorithm: str = 'unified',
+                          include_ops: bool = True) -> Dict:
         """Compare two documents using specified algorithm"""
         
         # Extract text and metadata
         text1, meta1 = self.extract_text_from_file(file1)
         text2, meta2 = self.extract_text_from_file(file2)
         
+        return self.compare_texts(file1, text1, meta1, file2, text2, meta2, algorithm, include_ops)
+    
+    def compare_texts(self, file1: str, text1: str, meta1: Dict, file2: str, text2: str, meta2: Dict,
+                      algorithm: str = 'unified', include_ops: bool = True) -> Dict:
+        """Compare already extracted texts, e.g. from a caller that caches extraction"""
+        
         # Perform comparison based on algorithm
         comparison_result = {
             'files': {
@@ -161,7 +482,7 @@ class EnhancedDocumentComparer:
         elif algorithm == 'context':
             comparison_result['differences'] = self._context_diff(text1, text2)
         elif algorithm == 'levenshtein':
-            comparison_result['differences'] = self._levenshtein_diff(text1, text2)
+            comparison_result['differences'] = self._levenshtein_diff(text1, text2, include_ops)
         elif algorithm == 'jaro_winkler':
             comparison_result['differences'] = self._jaro_winkler_diff(text1, text2)
         elif algorithm == 'semantic':
@@ -177,19 +498,18 @@ class EnhancedDocumentComparer:
         lines1 = text1.splitlines(keepends=True)
         lines2 = text2.splitlines(keepends=True)
         
-        diff = list(difflib.unified_diff(
-            lines1, lines2,
-            fromfile='File 1',
-            tofile='File 2',
-            lineterm='',
-            n=3  # More context lines
-        ))
+        if (pygit2 is not None and len(lines1) * len(lines2) > PATIENCE_DIFF_THRESHOLD
+                and not _NON_GIT_LINE_BREAKS_RE.search(text1)
+                and not _NON_GIT_LINE_BREAKS_RE.search(text2)):
+            diff = self._patience_unified_diff(text1, text2, n=3)
+        else:
+            diff = _unified_diff_lines(lines1, lines2, n=3)  # More context lines
         
         differences = []
         for i, line in enumerate(diff):
             if line.startswith('@@'):
                 # Parse hunk header
-                match = re.match(r'@@ -(\d+),?(\d*) \+(\d+),?(\d*) @@', line)
+                match = _HUNK_RE.match(line)
                 if match:
                     differences.append({
                         'type': 'hunk_header',
@@ -221,18 +541,39 @@ class EnhancedDocumentComparer:
         
         return differences
     
+    def _patience_unified_diff(self, text1: str, text2: str, n: int = 3) -> List[str]:
+        """Unified diff lines (difflib format) computed by libgit2's patience diff"""
+        patch = pygit2.Patch.create_from(
+            text1, text2,
+            old_as_path='File 1',
+            new_as_path='File 2',
+            # Never let libgit2's binary detection swallow the hunks
+            flag=pygit2.enums.DiffOption.PATIENCE | pygit2.enums.DiffOption.FORCE_TEXT,
+            context_lines=n
+        )
+        
+        hunks = patch.hunks
+        if not hunks:
+            return []  # Like difflib, identical texts produce no lines at all
+        
+        diff = ['--- File 1', '+++ File 2']
+        for hunk in hunks:
+            # libgit2 appends function context to its headers, rebuild difflib's
+            diff.append(f"@@ -{_format_range_git(hunk.old_start, hunk.old_lines)} "
+                        f"+{_format_range_git(hunk.new_start, hunk.new_lines)} @@")
+            for line in hunk.lines:
+                # Skip the "no newline at end of file" markers
+                if line.origin in (' ', '+', '-'):
+                    diff.append(line.origin + line.content)
+        
+        return diff
+    
     def _context_diff(self, text1: str, text2: str) -> List[Dict]:
         """Context diff with more surrounding lines"""
         lines1 = text1.splitlines(keepends=True)
         lines2 = text2.splitlines(keepends=True)
         
-        diff = list(difflib.context_diff(
-            lines1, lines2,
-            fromfile='File 1',
-            tofile='File 2',
-            lineterm='',
-            n=5  # More context
-        ))
+        diff = _context_diff_lines(lines1, lines2, n=5)  # More context
         
         differences = []
         for i, line in enumerate(diff):
@@ -253,24 +594,40 @@ class EnhancedDocumentComparer:
         
         return differences
     
-    def _levenshtein_diff(self, text1: str, text2: str) -> List[Dict]:
+    def _levenshtein_diff(self, text1: str, text2: str, include_ops: bool = True) -> List[Dict]:
         """Levenshtein distance-based comparison"""
-        distance = Levenshtein.distance(text1, text2)
-        ratio = Levenshtein.ratio(text1, text2)
-        
-        # Get edit operations
-        ops = Levenshtein.editops(text1, text2)
+        max_len = max(len(text1), len(text2))
+        
+        # The length difference is a lower bound on the distance; when only the
+        # similarity is needed and it alone rules the texts dissimilar, skip the
+        # O(N*M) computation
+        min_distance = abs(len(text1) - len(text2))
+        if not include_ops and max_len and min_distance / max_len > LEVENSHTEIN_SKIP_RATIO:
+            return [{
+                'type': 'summary',
+                'content': f"Levenshtein Distance: >= {min_distance}",
+                'similarity_ratio': 1 - min_distance / max_len,  # Upper bound
+                'edit_operations': None,
+                'estimated': True
+            }]
+        
+        # Edit operations are the expensive part, only compute them when needed
+        if include_ops:
+            distance, ops = self._edit_distance_ops(text1, text2, limit=100)
+        else:
+            distance, ops = self._edit_distance(text1, text2), []
+        ratio = max(0.0, 1 - distance / max_len) if max_len else 1.0
         
         differences = []
         differences.append({
             'type': 'summary',
             'content': f"Levenshtein Distance: {distance}",
             'similarity_ratio': ratio,
-            'edit_operations': len(ops)
+            'edit_operations': distance
         })
         
         # Convert edit operations to readable format
-        for i, (op, pos1, pos2) in enumerate(ops[:100]):  # Limit to first 100 operations
+        for i, (op, pos1, pos2) in enumerate(ops):  # Limited to first 100 operations
             if op == 'replace':
                 differences.append({
                     'type': 'replacement',
@@ -294,9 +651,75 @@ class EnhancedDocumentComparer:
         
         return differences
     
+    def _edlib_align(self, text1: str, text2: str, task: str) -> Optional[Dict]:
+        """Global edlib alignment of long texts, None when edlib can't be used"""
+        if edlib is None or max(len(text1), len(text2)) <= EDLIB_MIN_LENGTH:
+            return None
+        try:
+            return edlib.align(text1, text2, mode='NW', task=task)
+        except ValueError:
+            return None  # More than 256 distinct symbols, edlib can't encode the alphabet
+    
+    def _edit_distance(self, text1: str, text2: str) -> int:
+        """Edit distance using the fastest available backend"""
+        alignment = self._edlib_align(text1, text2, task='distance')
+        if alignment is not None:
+            return alignment['editDistance']
+        return self._dp_edit_distance(text1, text2)
+    
+    @staticmethod
+    def _dp_edit_distance(text1: str, text2: str) -> int:
+        """Dynamic-programming edit distance for short texts or ones edlib can't encode"""
+        if sz is not None:
+            # The byte kernel is only a character distance for ASCII text
+            if text1.isascii() and text2.isascii():
+                return sz.edit_distance(sz.Str(text1), sz.Str(text2))
+            return sz.edit_distance_unicode(text1, text2)
+        return Levenshtein.distance(text1, text2)
+    
+    def _edit_distance_ops(self, text1: str, text2: str,
+                           limit: Optional[int] = None) -> Tuple[int, List[Tuple[str, int, int]]]:
+        """Edit distance and operations as (op, pos1, pos2) tuples in Levenshtein.editops format"""
+        # A single path alignment yields both the distance and the CIGAR
+        alignment = self._edlib_align(text1, text2, task='path')
+        if alignment is not None:
+            return alignment['editDistance'], self._cigar_to_ops(alignment['cigar'], limit)
+        if text1 == text2:
+            return 0, []
+        # Every edit operation costs one, so the operations also give the distance
+        ops = Levenshtein.editops(text1, text2)
+        return len(ops), ops[:limit] if limit is not None else ops
+    
+    @staticmethod
+    def _cigar_to_ops(cigar: str, limit: Optional[int] = None) -> List[Tuple[str, int, int]]:
+        """Convert an edlib extended CIGAR (query=text1, target=text2) to edit operations"""
+        ops = []
+        pos1 = pos2 = 0
+        for match in _CIGAR_RE.finditer(cigar):
+            count, op = int(match.group(1)), match.group(2)
+            if op == '=':
+                pos1 += count
+                pos2 += count
+                continue
+            for _ in range(count):
+                if limit is not None and len(ops) >= limit:
+                    return ops
+                if op == 'X':
+                    ops.append(('replace', pos1, pos2))
+                    pos1 += 1
+                    pos2 += 1
+                elif op == 'I':
+                    # Extra character in the query, i.e. deleted from text1
+                    ops.append(('delete', pos1, pos2))
+                    pos1 += 1
+                else:
+                    ops.append(('insert', pos1, pos2))
+                    pos2 += 1
+        return ops
+    
     def _jaro_winkler_diff(self, text1: str, text2: str) -> List[Dict]:
         """Jaro-Winkler similarity comparison"""
-        similarity = textdistance.jaro_winkler(text1, text2)
+        similarity = _jaro_winkler(text1, text2)
         
         differences = [{
             'type': 'similarity_score',
@@ -309,14 +732,11 @@ class EnhancedDocumentComparer:
         words2 = text2.split()
         
         word_similarities = []
-        max_len = max(len(words1), len(words2))
         
-        for i in range(min(50, max_len)):  # Limit to first 50 words
-            w1 = words1[i] if i < len(words1) else ""
-            w2 = words2[i] if i < len(words2) else ""
-            
+        # Limit to first 50 words
+        for i, (w1, w2) in enumerate(islice(zip_longest(words1, words2, fillvalue=""), 50)):
             if w1 or w2:
-                word_sim = textdistance.jaro_winkler(w1, w2)
+                word_sim = _jaro_winkler(w1, w2)
                 word_similarities.append({
                     'position': i,
                     'word1': w1,
@@ -333,53 +753,85 @@ class EnhancedDocumentComparer:
     
     def _semantic_diff(self, text1: str, text2: str) -> List[Dict]:
         """Semantic similarity using multiple algorithms"""
-        algorithms = {
-            'jaccard': textdistance.jaccard,
-            'cosine': textdistance.cosine,
-            'overlap': textdistance.overlap,
-            'sorensen_dice': textdistance.sorensen_dice
-        }
+        metrics = ['jaccard', 'cosine', 'overlap', 'sorensen_dice']
+        
+        # Identical texts (including two empty ones) score 1.0 everywhere, and
+        # the comparison is a plain memcmp, no tokenizing needed
+        if text1 == text2:
+            return self._semantic_scores(dict.fromkeys(metrics, 1.0))
+        
+        # Tokenize once and derive every coefficient from the shared word counts;
+        # the Counter keys double as the word sets
+        counts1, counts2 = Counter(text1.split()), Counter(text2.split())
+        shared = counts1.keys() & counts2.keys()
+        size1, size2 = len(counts1), len(counts2)
+        common = len(shared)
+        total = size1 + size2 - common
+        
+        if not total:
+            # Both texts are whitespace only
+            similarities = dict.fromkeys(metrics, 1.0)
+        elif not common:
+            # No shared words (or one side empty), every coefficient is zero
+            similarities = dict.fromkeys(metrics, 0.0)
+        else:
+            dot = sum(counts1[w] * counts2[w] for w in shared)
+            norm = (math.sqrt(sum(c * c for c in counts1.values())) *
+                    math.sqrt(sum(c * c for c in counts2.values())))
+            similarities = {
+                'jaccard': common / total,
+                'cosine': dot / norm,
+                'overlap': common / min(size1, size2),
+                'sorensen_dice': 2 * common / (size1 + size2)
+            }
         
+        return self._semantic_scores(similarities)
+    
+    def _semantic_scores(self, similarities: Dict[str, float]) -> List[Dict]:
+        """Format similarity coefficients as semantic_score differences"""
         differences = []
-        
-        for name, algorithm in algorithms.items():
-            try:
-                similarity = algorithm(text1, text2)
-                differences.append({
-                    'type': 'semantic_score',
-                    'algorithm': name,
-                    'similarity': similarity,
-                    'percentage': f"{similarity * 100:.2f}%"
-                })
-            except Exception as e:
-                differences.append({
-                    'type': 'semantic_error',
-                    'algorithm': name,
-                    'error': str(e)
-                })
+        for name, similarity in similarities.items():
+            differences.append({
+                'type': 'semantic_score',
+                'algorithm': name,
+                'similarity': similarity,
+                'percentage': f"{similarity * 100:.2f}%"
+            })
         
         return differences
     
+    def _text_statistics(self, text: str) -> Dict:
+        """Character, word and line counts from a single split of the text"""
+        words = text.lower().split()
+        return {
+            'characters': len(text),
+            'words': len(words),
+            'lines': _count_lines(text),
+            'unique_words': len(set(words))
+        }
+    
     def _calculate_statistics(self, text1: str, text2: str, differences: List[Dict]) -> Dict:
         """Calculate comprehensive statistics"""
+        additions = deletions = replacements = changes = 0
+        for d in differences:
+            diff_type = d.get('type')
+            if diff_type == 'addition':
+                additions += 1
+            elif diff_type == 'deletion':
+                deletions += 1
+            elif diff_type == 'replacement':
+                replacements += 1
+            elif diff_type == 'change':
+                changes += 1
+        
         stats = {
-            'text1': {
-                'characters': len(text1),
-                'words': len(text1.split()),
-                'lines': len(text1.splitlines()),
-                'unique_words': len(set(text1.lower().split()))
-            },
-            'text2': {
-                'characters': len(text2),
-                'words': len(text2.split()),
-                'lines': len(text2.splitlines()),
-                'unique_words': len(set(text2.lower().split()))
-            },
+            'text1': self._text_statistics(text1),
+            'text2': self._text_statistics(text2),
             'differences': {
-                'total_changes': len([d for d in differences if d.get('type') in ['addition', 'deletion', 'replacement']]),
-                'additions': len([d for d in differences if d.get('type') == 'addition']),
-                'deletions': len([d for d in differences if d.get('type') == 'deletion']),
-                'modifications': len([d for d in differences if d.get('type') in ['replacement', 'change']])
+                'total_changes': additions + deletions + replacements,
+                'additions': additions,
+                'deletions': deletions,
+                'modifications': replacements + changes
             }
         }
         
@@ -460,90 +912,25 @@ class EnhancedDocumentComparer:
         
         # Detailed differences (limited to prevent huge files)
         doc.add_heading('Detailed Differences (First 100)', level=1)
-        for i, diff in enumerate(results['differences'][:100]):
-            if diff.get('type') == 'addition':
-                p = doc.add_paragraph()
-                run = p.add_run(f"+ {diff.get('content', '')}")
-                run.font.color.rgb = RGBColor(0, 128, 0)
-            elif diff.get('type') == 'deletion':
-                p = doc.add_paragraph()
-                run = p.add_run(f"- {diff.get('content', '')}")
-                run.font.color.rgb = RGBColor(255, 0, 0)
-            elif diff.get('type') == 'context':
-                p = doc.add_paragraph()
-                run = p.add_run(f"  {diff.get('content', '')}")
+        shown = results['differences'][:100]
+        for diff in shown:
+            style = _DOCX_DIFF_STYLES.get(diff.get('type'))
+            if style is None:
+                continue
+            prefix, color = style
+            run = doc.add_paragraph().add_run(f"{prefix}{diff.get('content', '')}")
+            if color is not None:
+                run.font.color.rgb = color
         
         doc.save(output_path)
         # Report saved successfully
     
     def _export_to_html(self, results: Dict, output_path: str):
         """Export to HTML with syntax highlighting"""
-        html_template = """
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Document Comparison Report</title>
-    <style>
-        body { font-family: Arial, sans-serif; margin: 20px; }
-        .header { background-color: #f0f0f0; padding: 15px; border-radius: 5px; }
-        .stats-table { border-collapse: collapse; width: 100%; margin: 20px 0; }
-        .stats-table th, .stats-table td { border: 1px solid #ddd; padding: 8px; text-align: left; }
-        .stats-table th { background-color: #f2f2f2; }
-        .addition { color: green; font-weight: bold; }
-        .deletion { color: red; font-weight: bold; }
-        .context { color: #666; }
-        .similarity { font-size: 24px; text-align: center; padding: 20px; }
-        .similarity.high { color: green; }
-        .similarity.medium { color: orange; }
-        .similarity.low { color: red; }
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>Enhanced Document Comparison Report</h1>
-        <p>Generated: {{ timestamp }}</p>
-        <p>Algorithm: {{ algorithm }}</p>
-    </div>
-    
-    <h2>Files Compared</h2>
-    <ul>
-        <li>File 1: {{ file1_path }}</li>
-        <li>File 2: {{ file2_path }}</li>
-    </ul>
-    
-    <h2>Statistics</h2>
-    <table class="stats-table">
-        <tr><th>Metric</th><th>File 1</th><th>File 2</th><th>Difference</th></tr>
-        <tr><td>Characters</td><td>{{ stats.text1.characters }}</td><td>{{ stats.text2.characters }}</td><td>{{ char_diff }}</td></tr>
-        <tr><td>Words</td><td>{{ stats.text1.words }}</td><td>{{ stats.text2.words }}</td><td>{{ word_diff }}</td></tr>
-        <tr><td>Lines</td><td>{{ stats.text1.lines }}</td><td>{{ stats.text2.lines }}</td><td>{{ line_diff }}</td></tr>
-    </table>
-    
-    <div class="similarity {{ similarity_class }}">
-        Similarity: {{ similarity }}%
-    </div>
-    
-    <h2>Differences</h2>
-    <div class="differences">
-        {% for diff in differences[:100] %}
-            {% if diff.type == 'addition' %}
-                <div class="addition">+ {{ diff.content }}</div>
-            {% elif diff.type == 'deletion' %}
-                <div class="deletion">- {{ diff.content }}</div>
-            {% elif diff.type == 'context' %}
-                <div class="context">  {{ diff.content }}</div>
-            {% endif %}
-        {% endfor %}
-    </div>
-</body>
-</html>
-        """
-        
-        template = Template(html_template)
         stats = results['statistics']
         similarity = stats.get('similarity_percentage', 0)
         
-        html_content = template.render(
+        context = dict(
             timestamp=results['timestamp'],
             algorithm=results['algorithm'],
             file1_path=results['files']['file1']['path'],
@@ -554,20 +941,28 @@ class EnhancedDocumentComparer:
             line_diff=abs(stats['text1']['lines'] - stats['text2']['lines']),
             similarity=f"{similarity:.2f}",
             similarity_class='high' if similarity > 80 else 'medium' if similarity > 50 else 'low',
-            differences=results['differences']
+            differences=results['differences'][:100]
         )
         
         with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+            _HTML_TEMPLATE.stream(**context).dump(f)
         
-        console.print(f"[green]HTML report saved to: {output_path}[/green]")
+        # Report saved successfully
     
     def _export_to_json(self, results: Dict, output_path: str):
         """Export to JSON format"""
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, default=str)
+        if orjson is not None:
+            # Encodes straight to UTF-8 bytes; datetimes go through default=str
+            # so the output matches the json fallback
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(results, default=str,
+                                     option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                                     | orjson.OPT_PASSTHROUGH_DATETIME))
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, default=str)
         
-        console.print(f"[green]JSON report saved to: {output_path}[/green]")
+        # Report saved successfully
     
     def _export_to_markdown(self, results: Dict, output_path: str):
         """Export to Markdown format"""
@@ -599,17 +994,20 @@ Algorithm: {results['algorithm']}
 """
         
         # Add differences (limited)
+        parts = [md_content]
+        append = parts.append
         for diff in results['differences'][:100]:
-            if diff.get('type') == 'addition':
-                md_content += f"+ {diff.get('content', '')}\n"
-            elif diff.get('type') == 'deletion':
-                md_content += f"- {diff.get('content', '')}\n"
-            elif diff.get('type') == 'context':
-                md_content += f"  {diff.get('content', '')}\n"
+            diff_type = diff.get('type')
+            if diff_type == 'addition':
+                append(f"+ {diff.get('content', '')}\n")
+            elif diff_type == 'deletion':
+                append(f"- {diff.get('content', '')}\n")
+            elif diff_type == 'context':
+                append(f"  {diff.get('content', '')}\n")
         
-        md_content += "```"
+        append("```")
         
         with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(md_content)
+            f.write("".join(parts))
         
         # Report saved 
\ No newline at end of file
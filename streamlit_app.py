@@ -1,17 +1,19 @@
 #!/usr/bin/env python3
 
 import streamlit as st
+from streamlit_autorefresh import st_autorefresh
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import html
+import math
 import tempfile
 import os
 from pathlib import Path
-import plotly.graph_objects as go
-import plotly.express as px
-import pandas as pd
-from document_diff import EnhancedDocumentComparer
+# plotly, pandas and document_diff (pdfplumber, python-docx, ...) are imported
+# where they are used so the first page load doesn't pay for them
 import json
 from datetime import datetime
 import time
-import hashlib
 
 # Page configuration
 st.set_page_config(
@@ -21,37 +23,25 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Add meta tags to prevent caching
-st.markdown("""
-    <meta http-equiv="Cache-Control" content="no-cache, no-store, must-revalidate" />
-    <meta http-equiv="Pragma" content="no-cache" />
-    <meta http-equiv="Expires" content="0" />
-""", unsafe_allow_html=True)
-
-# Custom CSS with cache busting
-def load_css():
-    # Create a cache-busting hash based on current time
-    cache_buster = hashlib.md5(str(time.time()).encode()).hexdigest()[:8]
-    
-    css = f"""
-    <style data-version="{cache_buster}">
-        /* Cache buster: {cache_buster} */
-        .main-header {{
+# Custom CSS, static so it is built once at import
+_CSS = """
+    <style>
+        .main-header {
             font-size: 2.5rem;
             color: #1f77b4;
             text-align: center;
             margin-bottom: 2rem;
             font-weight: bold;
-        }}
-        .comparison-card {{
+        }
+        .comparison-card {
             background-color: #e8f4fd;
             padding: 1.5rem;
             border-radius: 0.8rem;
             margin: 1rem 0;
             border: 2px solid #1f77b4;
             box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-        }}
-        .metric-card {{
+        }
+        .metric-card {
             background-color: #ffffff;
             padding: 1.5rem;
             border-radius: 0.8rem;
@@ -59,46 +49,46 @@ def load_css():
             margin: 0.5rem;
             text-align: center;
             box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-        }}
-        .similarity-high {{ 
+        }
+        .similarity-high { 
             color: #155724; 
             font-weight: bold;
             text-shadow: 1px 1px 2px rgba(0,0,0,0.1);
-        }}
-        .similarity-medium {{ 
+        }
+        .similarity-medium { 
             color: #856404; 
             font-weight: bold;
             text-shadow: 1px 1px 2px rgba(0,0,0,0.1);
-        }}
-        .similarity-low {{ 
+        }
+        .similarity-low { 
             color: #721c24; 
             font-weight: bold;
             text-shadow: 1px 1px 2px rgba(0,0,0,0.1);
-        }}
-        .diff-addition {{
+        }
+        .diff-addition {
             background-color: #c3e6cb !important;
             border: 2px solid #28a745 !important;
             color: #155724 !important;
             font-weight: 500 !important;
-        }}
-        .diff-deletion {{
+        }
+        .diff-deletion {
             background-color: #f5c6cb !important;
             border: 2px solid #dc3545 !important;
             color: #721c24 !important;
             font-weight: 500 !important;
-        }}
-        .diff-change {{
+        }
+        .diff-change {
             background-color: #ffeaa7 !important;
             border: 2px solid #ffc107 !important;
             color: #856404 !important;
             font-weight: 500 !important;
-        }}
-        .similarity-display {{
+        }
+        .similarity-display {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
             color: white !important;
             text-shadow: 2px 2px 4px rgba(0,0,0,0.3) !important;
-        }}
-        .refresh-btn {{
+        }
+        .refresh-btn {
             background-color: #28a745;
             color: white;
             border: none;
@@ -106,20 +96,212 @@ def load_css():
             border-radius: 0.3rem;
             cursor: pointer;
             font-weight: bold;
-        }}
-        .refresh-btn:hover {{
+        }
+        .refresh-btn:hover {
             background-color: #218838;
-        }}
+        }
     </style>
     """
-    return css
 
-# Load CSS with cache busting
-st.markdown(load_css(), unsafe_allow_html=True)
+st.markdown(_CSS, unsafe_allow_html=True)
+
+# MIME types of the export formats offered for download
+_MIME_TYPES = {
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'html': 'text/html',
+    'json': 'application/json',
+    'markdown': 'text/markdown'
+}
+
+# (lower bound, emoji) of the similarity score buckets, highest first
+_SIM_BUCKETS = (
+    (80, "🟢"),
+    (50, "🟡"),
+    (0, "🔴")
+)
+
+_SIM_CARD_TMPL = """
+<div class="similarity-display" style="text-align: center; padding: 2.5rem; border-radius: 1rem; margin: 1rem 0; box-shadow: 0 6px 12px rgba(0,0,0,0.15);">
+    <h2 style="margin: 0; font-size: 1.8rem;">{emoji} Overall Similarity</h2>
+    <h1 style="font-size: 4rem; margin: 0.5rem 0; font-weight: bold;">{similarity:.1f}%</h1>
+    <p style="margin: 0; font-size: 1.2rem; opacity: 0.9;">Document Comparison Score</p>
+</div>
+"""
+
+# Uploads are written to temp files in slices of this size
+WRITE_CHUNK_SIZE = 1 << 20
+
+# Uploads up to this size are written to RAM-backed tmpfs when available; the
+# files are removed as soon as the comparison has read them
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+_RAM_TMP_DIR = '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) else None
+
+# Number of difference cards rendered per page
+DIFF_PAGE_SIZE = 25
+
+# Difference cards for the line-by-line view, filled with escaped content
+_DIFF_CARD_TMPL = """<div class="{css_class}" style="padding: 1rem; margin: 0.5rem 0; border-radius: 0.5rem;">
+<strong style="font-size: 1.1rem;">{label}:</strong><br/>
+<span style="font-family: monospace; background-color: rgba(255,255,255,0.3); padding: 0.2rem; border-radius: 0.2rem;">
+{{content}}
+</span>
+</div>"""
+_ADDITION_TMPL = _DIFF_CARD_TMPL.format(css_class="diff-addition", label="➕ Addition")
+_DELETION_TMPL = _DIFF_CARD_TMPL.format(css_class="diff-deletion", label="➖ Deletion")
+_CHANGE_TMPL = _DIFF_CARD_TMPL.format(css_class="diff-change", label="🔄 Change")
+_DIFF_TEMPLATES = {
+    'addition': _ADDITION_TMPL,
+    'deletion': _DELETION_TMPL,
+    'replacement': _CHANGE_TMPL,
+    'change': _CHANGE_TMPL
+}
+
+def _write_temp_file(data, suffix: str, dir: str = None) -> str:
+    """Write data straight to a new temp file's descriptor and return its path"""
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=dir)
+    try:
+        # Zero-copy slices of the upload buffer, one bounded write per chunk
+        view = memoryview(data)
+        for start in range(0, len(view), WRITE_CHUNK_SIZE):
+            chunk = view[start:start + WRITE_CHUNK_SIZE]
+            while chunk:
+                chunk = chunk[os.write(fd, chunk):]
+    except BaseException:
+        os.close(fd)
+        os.unlink(path)
+        raise
+    os.close(fd)
+    return path
+
+def _upload_key(upload) -> str:
+    """Content key of an upload, hashed once per uploaded file"""
+    if "_upload_keys" not in st.session_state:
+        st.session_state._upload_keys = {}
+    upload_keys = st.session_state._upload_keys
+    
+    # file_id changes whenever a new file is uploaded
+    key = upload_keys.get(upload.file_id)
+    if key is None:
+        key = hashlib.blake2b(upload.getbuffer(), digest_size=16).hexdigest() + Path(upload.name).suffix
+        upload_keys[upload.file_id] = key
+    return key
+
+def _materialize_upload(upload) -> str:
+    """Write an upload to a temp file the comparer can open and return its path"""
+    suffix = Path(upload.name).suffix
+    # Small uploads go to RAM-backed tmpfs, they only live for one comparison
+    if _RAM_TMP_DIR is not None and upload.size <= SPOOL_MAX_SIZE:
+        try:
+            return _write_temp_file(upload.getbuffer(), suffix, dir=_RAM_TMP_DIR)
+        except OSError:
+            pass  # tmpfs is full (Docker's /dev/shm is 64 MiB by default), use the disk
+    return _write_temp_file(upload.getbuffer(), suffix)
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _extract_upload(key: str, _upload) -> tuple:
+    """(text, metadata) of an upload; cached on its content key so every algorithm shares one parse"""
+    from document_diff import EnhancedDocumentComparer
+    
+    # The temp file is only needed while extracting, cache hits never touch disk
+    path = _materialize_upload(_upload)
+    try:
+        return EnhancedDocumentComparer().extract_text_from_file(path)
+    finally:
+        os.unlink(path)
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _run_comparison(key1: str, key2: str, algorithm: str, include_ops: bool, _file1, _file2) -> dict:
+    """Compare two uploads; cached on their content keys so reruns skip parsing and diffing"""
+    from document_diff import EnhancedDocumentComparer
+    
+    text1, meta1 = _extract_upload(key1, _file1)
+    text2, meta2 = _extract_upload(key2, _file2)
+    return EnhancedDocumentComparer().compare_texts(_file1.name, text1, meta1, _file2.name, text2, meta2,
+                                                    algorithm, include_ops)
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _build_figs(stats_key: tuple) -> tuple:
+    """Size, changes and similarity figures, cached on the plotted numbers and shared read-only"""
+    import plotly.graph_objects as go
+    
+    (chars1, words1, lines1, chars2, words2, lines2,
+     total_changes, additions, deletions, modifications, similarity) = stats_key
+    
+    # Document comparison chart
+    fig_comparison = go.Figure(
+        data=[
+            go.Bar(name='File 1', x=['Characters', 'Words', 'Lines'], 
+                   y=[chars1, words1, lines1],
+                   marker_color='#1f77b4'),
+            go.Bar(name='File 2', x=['Characters', 'Words', 'Lines'], 
+                   y=[chars2, words2, lines2],
+                   marker_color='#ff7f0e')
+        ],
+        layout=dict(
+            title="Document Size Comparison",
+            xaxis_title="Metrics",
+            yaxis_title="Count",
+            barmode='group',
+            height=400
+        )
+    )
+    
+    if total_changes <= 0:
+        return fig_comparison, None, None
+    
+    # Changes pie chart
+    fig_changes = go.Figure(
+        data=[go.Pie(
+            labels=['Additions', 'Deletions', 'Modifications'],
+            values=[additions, deletions, modifications],
+            hole=.3,
+            marker_colors=['#2e7d32', '#c62828', '#f57c00']
+        )],
+        layout=dict(
+            title="Distribution of Changes",
+            height=400
+        )
+    )
+    
+    # Similarity gauge
+    fig_gauge = go.Figure(
+        data=go.Indicator(
+            mode="gauge+number+delta",
+            value=similarity,
+            domain={'x': [0, 1], 'y': [0, 1]},
+            title={'text': "Similarity Score"},
+            delta={'reference': 80},
+            gauge={
+                'axis': {'range': [None, 100]},
+                'bar': {'color': "#1f77b4"},
+                'steps': [
+                    {'range': [0, 50], 'color': "#ffcccb"},
+                    {'range': [50, 80], 'color': "#fff2cc"},
+                    {'range': [80, 100], 'color': "#c8e6c9"}
+                ],
+                'threshold': {
+                    'line': {'color': "#d32f2f", 'width': 4},
+                    'thickness': 0.75,
+                    'value': 90
+                }
+            }
+        ),
+        layout=dict(height=400)
+    )
+    
+    return fig_comparison, fig_changes, fig_gauge
 
 class StreamlitDocumentComparer:
     def __init__(self):
-        self.comparer = EnhancedDocumentComparer()
+        self._comparer = None
+    
+    @property
+    def comparer(self):
+        # main() builds the app on every rerun, only load document_diff once needed
+        if self._comparer is None:
+            from document_diff import EnhancedDocumentComparer
+            self._comparer = EnhancedDocumentComparer()
+        return self._comparer
         
     def main(self):
         # Initialize session state for refresh
@@ -139,10 +321,6 @@ class StreamlitDocumentComparer:
         with col3:
             st.markdown(f"<small>Last updated: {datetime.fromtimestamp(st.session_state.last_refresh).strftime('%H:%M:%S')}</small>", unsafe_allow_html=True)
         
-        # Force CSS reload on refresh
-        if time.time() - st.session_state.last_refresh < 1:
-            st.markdown(load_css(), unsafe_allow_html=True)
-        
         # Sidebar configuration
         with st.sidebar:
             st.header("⚙️ Configuration")
@@ -153,6 +331,16 @@ class StreamlitDocumentComparer:
                 help="Choose the algorithm for document comparison"
             )
             
+            include_ops = st.checkbox(
+                "List Edit Operations",
+                value=True,
+                disabled=algorithm != 'levenshtein',
+                help="Levenshtein only: untick to compute just the distance and similarity, "
+                     "much faster for documents of very different length"
+            )
+            # Only Levenshtein reads it, keep it out of the other algorithms' cache keys
+            include_ops = include_ops or algorithm != 'levenshtein'
+            
             export_formats = st.multiselect(
                 "Export Formats",
                 options=['docx', 'html', 'json', 'markdown'],
@@ -163,10 +351,15 @@ class StreamlitDocumentComparer:
             st.markdown("---")
             st.markdown("### 🔧 Advanced Options")
             
-            show_metadata = st.checkbox("Show File Metadata", value=True)
-            show_statistics = st.checkbox("Show Statistics", value=True)
-            show_visualizations = st.checkbox("Show Visualizations", value=True)
-            max_differences = st.slider("Max Differences to Display", 10, 500, 100)
+            # Display options only take effect on submit, so dragging the slider
+            # or toggling them doesn't rerun the app on every change
+            with st.form("config", clear_on_submit=False, border=False):
+                show_metadata = st.checkbox("Show File Metadata", value=True)
+                show_statistics = st.checkbox("Show Statistics", value=True)
+                show_visualizations = st.checkbox("Show Visualizations", value=True)
+                max_differences = st.slider("Max Differences to Display", 10, 500, 100)
+                
+                st.form_submit_button("Apply", use_container_width=True)
             
             st.markdown("---")
             st.markdown("### 🛠️ Developer Options")
@@ -174,8 +367,8 @@ class StreamlitDocumentComparer:
             auto_refresh = st.checkbox("Auto-refresh UI", value=False, help="Automatically refresh the UI every 5 seconds")
             
             if auto_refresh:
-                time.sleep(5)
-                st.rerun()
+                # Browser-side timer, no server thread is held while waiting
+                st_autorefresh(interval=5000, key="auto_refresh")
             
             if st.button("🧹 Clear Cache", help="Clear browser cache and refresh"):
                 st.cache_data.clear()
@@ -196,13 +389,8 @@ class StreamlitDocumentComparer:
             
             if file1:
                 st.success(f"✅ {file1.name} uploaded successfully")
-                file1_details = {
-                    "Name": file1.name,
-                    "Size": f"{file1.size:,} bytes",
-                    "Type": file1.type
-                }
                 if show_metadata:
-                    st.json(file1_details)
+                    st.caption(f"**{file1.name}** · {file1.size:,} bytes · {file1.type}")
         
         with col2:
             st.subheader("🗂️ File 2")
@@ -215,13 +403,8 @@ class StreamlitDocumentComparer:
             
             if file2:
                 st.success(f"✅ {file2.name} uploaded successfully")
-                file2_details = {
-                    "Name": file2.name,
-                    "Size": f"{file2.size:,} bytes",
-                    "Type": file2.type
-                }
                 if show_metadata:
-                    st.json(file2_details)
+                    st.caption(f"**{file2.name}** · {file2.size:,} bytes · {file2.type}")
         
         # Comparison button
         if file1 and file2:
@@ -229,8 +412,15 @@ class StreamlitDocumentComparer:
             
             col1, col2, col3 = st.columns([1, 2, 1])
             with col2:
+                # Remember which pair and settings were compared so widget reruns (e.g.
+                # paging through differences) keep showing its results, while a new
+                # algorithm still waits for the button
+                compared_files = (file1.name, file1.size, file2.name, file2.size, algorithm, include_ops)
                 if st.button("🔍 Compare Documents", type="primary", use_container_width=True):
-                    self.compare_documents(file1, file2, algorithm, export_formats, 
+                    st.session_state.compared_files = compared_files
+                
+                if st.session_state.get('compared_files') == compared_files:
+                    self.compare_documents(file1, file2, algorithm, include_ops, export_formats, 
                                          show_statistics, show_visualizations, max_differences)
         
         # Help section
@@ -253,23 +443,15 @@ class StreamlitDocumentComparer:
             - **Semantic**: Multiple semantic similarity metrics
             """)
     
-    def compare_documents(self, file1, file2, algorithm, export_formats, 
+    def compare_documents(self, file1, file2, algorithm, include_ops, export_formats, 
                          show_statistics, show_visualizations, max_differences):
         """Perform document comparison and display results"""
         
         with st.spinner("🔄 Processing documents..."):
             try:
-                # Save uploaded files to temporary locations
-                with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file1.name).suffix) as tmp1:
-                    tmp1.write(file1.getvalue())
-                    tmp1_path = tmp1.name
-                
-                with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file2.name).suffix) as tmp2:
-                    tmp2.write(file2.getvalue())
-                    tmp2_path = tmp2.name
-                
-                # Perform comparison
-                results = self.comparer.compare_documents(tmp1_path, tmp2_path, algorithm)
+                # Perform comparison (cached on file content and algorithm)
+                results = _run_comparison(_upload_key(file1), _upload_key(file2), algorithm, include_ops,
+                                          file1, file2)
                 
                 # Display results
                 self.display_results(results, show_statistics, show_visualizations, max_differences)
@@ -277,10 +459,6 @@ class StreamlitDocumentComparer:
                 # Generate exports
                 self.generate_exports(results, export_formats, file1.name, file2.name)
                 
-                # Cleanup temporary files
-                os.unlink(tmp1_path)
-                os.unlink(tmp2_path)
-                
             except Exception as e:
                 st.error(f"❌ Error during comparison: {str(e)}")
                 st.exception(e)
@@ -294,23 +472,9 @@ class StreamlitDocumentComparer:
         # Similarity score (prominent display)
         similarity = results['statistics'].get('similarity_percentage', 0)
         
-        if similarity > 80:
-            similarity_class = "similarity-high"
-            emoji = "🟢"
-        elif similarity > 50:
-            similarity_class = "similarity-medium"
-            emoji = "🟡"
-        else:
-            similarity_class = "similarity-low"
-            emoji = "🔴"
-        
-        st.markdown(f"""
-        <div class="similarity-display" style="text-align: center; padding: 2.5rem; border-radius: 1rem; margin: 1rem 0; box-shadow: 0 6px 12px rgba(0,0,0,0.15);">
-            <h2 style="margin: 0; font-size: 1.8rem;">{emoji} Overall Similarity</h2>
-            <h1 style="font-size: 4rem; margin: 0.5rem 0; font-weight: bold;">{similarity:.1f}%</h1>
-            <p style="margin: 0; font-size: 1.2rem; opacity: 0.9;">Document Comparison Score</p>
-        </div>
-        """, unsafe_allow_html=True)
+        emoji = next((e for threshold, e in _SIM_BUCKETS if similarity > threshold), _SIM_BUCKETS[-1][1])
+        
+        st.markdown(_SIM_CARD_TMPL.format(emoji=emoji, similarity=similarity), unsafe_allow_html=True)
         
         if show_statistics:
             self.display_statistics(results)
@@ -381,75 +545,29 @@ class StreamlitDocumentComparer:
         st.subheader("📊 Visual Analysis")
         
         stats = results['statistics']
-        
-        # Document comparison chart
-        fig_comparison = go.Figure(data=[
-            go.Bar(name='File 1', x=['Characters', 'Words', 'Lines'], 
-                   y=[stats['text1']['characters'], stats['text1']['words'], stats['text1']['lines']],
-                   marker_color='#1f77b4'),
-            go.Bar(name='File 2', x=['Characters', 'Words', 'Lines'], 
-                   y=[stats['text2']['characters'], stats['text2']['words'], stats['text2']['lines']],
-                   marker_color='#ff7f0e')
-        ])
-        
-        fig_comparison.update_layout(
-            title="Document Size Comparison",
-            xaxis_title="Metrics",
-            yaxis_title="Count",
-            barmode='group',
-            height=400
+        changes = stats['differences']
+        stats_key = (
+            stats['text1']['characters'], stats['text1']['words'], stats['text1']['lines'],
+            stats['text2']['characters'], stats['text2']['words'], stats['text2']['lines'],
+            changes['total_changes'], changes['additions'], changes['deletions'], changes['modifications'],
+            stats.get('similarity_percentage', 0)
         )
+        # Figures are passed as-is, a dict would be rebuilt and validated on every call
+        fig_comparison, fig_changes, fig_gauge = _build_figs(stats_key)
         
         st.plotly_chart(fig_comparison, use_container_width=True)
         
-        # Changes pie chart
-        changes = stats['differences']
-        if changes['total_changes'] > 0:
-            fig_changes = go.Figure(data=[go.Pie(
-                labels=['Additions', 'Deletions', 'Modifications'],
-                values=[changes['additions'], changes['deletions'], changes['modifications']],
-                hole=.3,
-                marker_colors=['#2e7d32', '#c62828', '#f57c00']
-            )])
-            
-            fig_changes.update_layout(
-                title="Distribution of Changes",
-                height=400
-            )
-            
+        if fig_changes is not None:
             col1, col2 = st.columns(2)
             with col1:
                 st.plotly_chart(fig_changes, use_container_width=True)
             
             with col2:
-                # Similarity gauge
-                fig_gauge = go.Figure(go.Indicator(
-                    mode="gauge+number+delta",
-                    value=stats.get('similarity_percentage', 0),
-                    domain={'x': [0, 1], 'y': [0, 1]},
-                    title={'text': "Similarity Score"},
-                    delta={'reference': 80},
-                    gauge={
-                        'axis': {'range': [None, 100]},
-                        'bar': {'color': "#1f77b4"},
-                        'steps': [
-                            {'range': [0, 50], 'color': "#ffcccb"},
-                            {'range': [50, 80], 'color': "#fff2cc"},
-                            {'range': [80, 100], 'color': "#c8e6c9"}
-                        ],
-                        'threshold': {
-                            'line': {'color': "#d32f2f", 'width': 4},
-                            'thickness': 0.75,
-                            'value': 90
-                        }
-                    }
-                ))
-                
-                fig_gauge.update_layout(height=400)
                 st.plotly_chart(fig_gauge, use_container_width=True)
     
     def display_differences(self, results, max_differences):
         """Display detailed differences"""
+        import pandas as pd
         
         st.subheader("🔍 Detailed Differences")
         
@@ -465,36 +583,16 @@ class StreamlitDocumentComparer:
         with tab1:
             st.markdown("### Line-by-Line Changes")
             
-            for i, diff in enumerate(differences):
-                if diff.get('type') == 'addition':
-                    st.markdown(f"""
-                    <div class="diff-addition" style="padding: 1rem; margin: 0.5rem 0; border-radius: 0.5rem;">
-                        <strong style="font-size: 1.1rem;">➕ Addition:</strong><br/>
-                        <span style="font-family: monospace; background-color: rgba(255,255,255,0.3); padding: 0.2rem; border-radius: 0.2rem;">
-                        {diff.get('content', '')[:300]}{'...' if len(diff.get('content', '')) > 300 else ''}
-                        </span>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                elif diff.get('type') == 'deletion':
-                    st.markdown(f"""
-                    <div class="diff-deletion" style="padding: 1rem; margin: 0.5rem 0; border-radius: 0.5rem;">
-                        <strong style="font-size: 1.1rem;">➖ Deletion:</strong><br/>
-                        <span style="font-family: monospace; background-color: rgba(255,255,255,0.3); padding: 0.2rem; border-radius: 0.2rem;">
-                        {diff.get('content', '')[:300]}{'...' if len(diff.get('content', '')) > 300 else ''}
-                        </span>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                elif diff.get('type') in ['replacement', 'change']:
-                    st.markdown(f"""
-                    <div class="diff-change" style="padding: 1rem; margin: 0.5rem 0; border-radius: 0.5rem;">
-                        <strong style="font-size: 1.1rem;">🔄 Change:</strong><br/>
-                        <span style="font-family: monospace; background-color: rgba(255,255,255,0.3); padding: 0.2rem; border-radius: 0.2rem;">
-                        {diff.get('content', '')[:300]}{'...' if len(diff.get('content', '')) > 300 else ''}
-                        </span>
-                    </div>
-                    """, unsafe_allow_html=True)
+            cards = self.diff_cards(results, differences)
+            
+            # Only one page of cards is in the DOM at a time
+            n_pages = math.ceil(len(cards) / DIFF_PAGE_SIZE)
+            page = 1
+            if n_pages > 1:
+                page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, step=1)
+            
+            # One markdown element for all cards instead of one per difference
+            st.markdown("".join(cards[(page - 1) * DIFF_PAGE_SIZE:page * DIFF_PAGE_SIZE]), unsafe_allow_html=True)
         
         with tab2:
             # Algorithm-specific summaries
@@ -515,9 +613,29 @@ class StreamlitDocumentComparer:
                     st.dataframe(df)
         
         with tab3:
-            st.json({"total_differences": len(results['differences']), 
-                    "showing": len(differences),
-                    "differences": differences})
+            st.markdown(f"**Total:** {len(results['differences'])} · **Showing:** {len(differences)}")
+            # Virtualized grid instead of a JSON tree with a node per leaf
+            st.dataframe(pd.DataFrame(differences), use_container_width=True, height=600)
+    
+    def diff_cards(self, results, differences):
+        """Truncated, escaped HTML card per displayable difference, built once per result set"""
+        cache_key = (results['timestamp'], results['algorithm'], len(differences))
+        cached = st.session_state.get('_diff_cards')
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
+        
+        cards = []
+        for diff in differences:
+            template = _DIFF_TEMPLATES.get(diff.get('type'))
+            if template is None:
+                continue
+            content = diff.get('content', '')
+            if len(content) > 300:
+                content = content[:300] + '...'
+            cards.append(template.format(content=html.escape(content)))
+        
+        st.session_state._diff_cards = (cache_key, cards)
+        return cards
     
     def generate_exports(self, results, export_formats, file1_name, file2_name):
         """Generate and provide download links for exports"""
@@ -527,42 +645,56 @@ class StreamlitDocumentComparer:
         
         st.subheader("💾 Download Results")
         
-        # Create temporary directory for exports
-        temp_dir = Path(tempfile.mkdtemp())
-        
-        try:
+        # Results stay on screen across reruns, build each export once per result set
+        cache_key = (results['timestamp'], file1_name, file2_name)
+        cached = st.session_state.get('_exports')
+        if cached is None or cached[0] != cache_key:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             base_filename = f"comparison_{Path(file1_name).stem}_vs_{Path(file2_name).stem}_{timestamp}"
+            cached = (cache_key, base_filename, {})
+            st.session_state._exports = cached
+        _, base_filename, exports = cached
+        
+        try:
+            missing = [fmt for fmt in export_formats if fmt not in exports]
+            if missing:
+                # Create temporary directory for exports, removed once the bytes are read
+                # Resolve the lazy comparer here, not concurrently in the workers
+                comparer = self.comparer
+                with tempfile.TemporaryDirectory() as temp_dir:
+                    def export_file(format_type):
+                        output_path = Path(temp_dir) / f"{base_filename}.{format_type}"
+                        comparer.export_results(results, str(output_path), format_type)
+                        return output_path.read_bytes()
+                    
+                    # Exports are independent and mostly I/O and zlib work, build them
+                    # concurrently; Streamlit calls stay on the script thread
+                    with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+                        futures = {fmt: executor.submit(export_file, fmt) for fmt in missing}
+                    
+                    for format_type, future in futures.items():
+                        try:
+                            exports[format_type] = future.result()
+                        except Exception as e:
+                            st.warning(f"⚠️ Could not generate {format_type.upper()} export: {str(e)}")
             
             for format_type in export_formats:
-                try:
-                    output_path = temp_dir / f"{base_filename}.{format_type}"
-                    self.comparer.export_results(results, str(output_path), format_type)
-                    
-                    with open(output_path, 'rb') as f:
-                        st.download_button(
-                            label=f"📥 Download {format_type.upper()} Report",
-                            data=f.read(),
-                            file_name=f"{base_filename}.{format_type}",
-                            mime=self.get_mime_type(format_type),
-                            key=f"download_{format_type}"
-                        )
-                
-                except Exception as e:
-                    st.warning(f"⚠️ Could not generate {format_type.upper()} export: {str(e)}")
+                if format_type not in exports:
+                    continue
+                st.download_button(
+                    label=f"📥 Download {format_type.upper()} Report",
+                    data=exports[format_type],
+                    file_name=f"{base_filename}.{format_type}",
+                    mime=self.get_mime_type(format_type),
+                    key=f"download_{format_type}"
+                )
         
         except Exception as e:
             st.error(f"❌ Error generating exports: {str(e)}")
     
     def get_mime_type(self, format_type):
         """Get MIME type for different formats"""
-        mime_types = {
-            'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            'html': 'text/html',
-            'json': 'application/json',
-            'markdown': 'text/markdown'
-        }
-        return mime_types.get(format_type, 'application/octet-stream')
+        return _MIME_TYPES.get(format_type, 'application/octet-stream')
 
 
 def main():